@@ -1,37 +1,79 @@
 #!/usr/bin/env python3
 import concurrent.futures
+import contextlib
+import functools
 import sys
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import xlsxwriter
 import openpyxl
 import os
+import shelve
+import threading
+import time
 from io import BytesIO
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from PIL import Image, ImageFont
-import json
-from typing import Optional, List, Tuple, Dict, Any, Callable
+import orjson
+from typing import Optional, List, Tuple, Dict, Any, Callable, Set
 from enum import Enum, auto
 from urllib.parse import urlparse, parse_qs
 import yaml
 from datetime import datetime
 from xlsxwriter.format import Format
+from xlsxwriter.worksheet import Worksheet
+
+# libyaml이 있으면 C로 구현된 로더/덤퍼를 사용해요.
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
 
 VERSION: str = "1.5.3"
 
+# 네트워크 대기가 대부분인 작업이라 CPU 코어 수보다 넉넉하게 잡아요.
+MAX_WORKERS: int = 16
+
+# 메모가 이렇게 시작하면 하이퍼링크로 써요.
+MEMO_URL_PREFIXES: Tuple[str, ...] = ("http://", "https://", "ftp://", "ftps://", "mailto:", "file://", "internal:", "external:")
+
+# 리다이렉트 없이 바로 https로 요청해요.
+ALADIN_LOOKUP_URL: str = "https://www.aladin.co.kr/ttb/api/ItemLookUp.aspx"
+ALADIN_LOOKUP_PARAMS: Dict[str, str] = {
+    "output": "js",
+    "Version": "20131101",
+    "OptResult": "Story,categoryIdList,bestSellerRank,ratingInfo,reviewList"
+}
+
+# 조회 결과 캐시 파일
+CACHE_FILE: str = ".bookcache"
+# 캐시 유지 시간 (None은 만료 없음, 네트워크 오류 때는 만료된 캐시도 사용)
+ALADIN_CACHE_TTL: Optional[int] = 7 * 24 * 60 * 60
+COVER_CACHE_TTL: Optional[int] = None
+LIBRARY_CACHE_TTL: Optional[int] = 6 * 60 * 60
+
+# 원본 JPEG 커버가 셀 크기의 이 배수 이하면 다시 인코딩하지 않고 그대로 넣어요.
+COVER_REENCODE_MAX_RATIO: float = 1.5
+
 
 class LibraryBookStatus(Enum):
     EXISTS = auto()
     NOT_EXISTS = auto()
     UNKNOWN = auto()
 
-@dataclass
+# 도서 수만큼 인스턴스가 생기니 __dict__ 대신 슬롯을 사용해요.
+@dataclass(slots=True)
 class Book:
     item_id: Optional[int] = None # 알라딘 아이템 아이디
     order: int = 0
     key: Optional[int] = None # 도서관 도서 키
     species_key: Optional[int] = None # 도서관 도서 종류 키
     title: str = ''
-    cover: Optional[BytesIO] = None
+    cover: Optional[bytes] = None # 커버 이미지 원본 바이트
+    cover_format: str = '' # 커버 이미지 형식 (Pillow 기준, 예: 'JPEG')
+    cover_size: Tuple[int, int] = (0, 0) # 커버 이미지 원본 크기 (px)
+    cover_dpi: Tuple[float, float] = (96.0, 96.0) # xlsxwriter가 크기 계산에 사용하는 DPI
     author: str = ''
     publisher: str = ''
     isbn13: str = ''
@@ -47,11 +89,21 @@ class Book:
     best_seller_rank: str = ''
     memo: str = ''
 
+# 열마다 셀을 쓰는 방법
+class CellKind(Enum):
+    IMAGE = auto()
+    TEXT = auto()
+    NUMBER = auto()
+    TITLE = auto()
+    LIBRARY = auto()
+    MEMO = auto()
+
 class Column:
-    def __init__(self, header: str, getter: Callable[[Book], Any], fmt_key: Optional[str]):
+    def __init__(self, header: str, getter: Callable[[Book], Any], fmt_key: Optional[str], kind: CellKind):
         self.header: str = header
         self.getter: Callable[[Book], Any] = getter
         self.fmt_key: Optional[str] = fmt_key
+        self.kind: CellKind = kind
 
 class FormatManager:
     def __init__(self, workbook: xlsxwriter.Workbook, font_size_pt: int):
@@ -77,33 +129,127 @@ class FormatManager:
     def get(self, key: str) -> Optional[Format]:
         return self.fmts.get(key)
     
+# 별점 문자열은 round(평점 / 2) 값으로 미리 만든 표에서 찾아 써요.
+STAR_STRINGS: Tuple[str, ...] = tuple("★" * k + "☆" * (5 - k) for k in range(6))
+
+# 발간 날짜 확인 기준 (5년 이전 출판 도서)
+CURRENT_YEAR: int = datetime.now().year
+OLD_BOOK_CRITERIA: str = f'=AND(ISNUMBER(VALUE(LEFT($G2,4))), VALUE(LEFT($G2,4))<>{CURRENT_YEAR}, VALUE(LEFT($G2,4))<{CURRENT_YEAR - 4})'
+
+# 커버 이미지 열의 위치와 크기
+IMG_IDX: int = 0
+IMG_COL_WIDTH_CHAR: int = 16
+IMG_ROW_HEIGHT: float = 112
+
 COLUMNS: List[Column] = [
-    Column('', lambda b: b.cover, None),
-    Column('도서', lambda b: b.title, 'center'),
-    Column('저자', lambda b: b.author, 'center'),
-    Column('출판사', lambda b: b.publisher, 'center'),
-    Column('ISBN13', lambda b: b.isbn13, 'center'),
-    Column('정가', lambda b: b.standard_price, 'price'),
-    Column('출판일', lambda b: b.publish_date, 'center'),
-    Column('설명', lambda b: b.description, 'left'),
-    Column('평점', lambda b: f'{b.rating_score:.1f} {"★"*round(b.rating_score/2)+"☆"*(5-round(b.rating_score/2))} ({b.rating_count})', 'center'),
-    Column('판매 지수', lambda b: b.sales_point, 'sales_point'),
-    Column('카테고리', lambda b: b.category, 'left'),
-    Column('교내 도서관 소장', lambda b: 'O' if b.library_status == LibraryBookStatus.EXISTS else ('X' if b.library_status == LibraryBookStatus.NOT_EXISTS else '?'), 'center'),
+    Column('', lambda b: b.cover, None, CellKind.IMAGE),
+    Column('도서', lambda b: b.title, 'center', CellKind.TITLE),
+    Column('저자', lambda b: b.author, 'center', CellKind.TEXT),
+    Column('출판사', lambda b: b.publisher, 'center', CellKind.TEXT),
+    Column('ISBN13', lambda b: b.isbn13, 'center', CellKind.TEXT),
+    Column('정가', lambda b: b.standard_price, 'price', CellKind.NUMBER),
+    Column('출판일', lambda b: b.publish_date, 'center', CellKind.TEXT),
+    Column('설명', lambda b: b.description, 'left', CellKind.TEXT),
+    Column('평점', lambda b: f'{b.rating_score:.1f} {STAR_STRINGS[round(b.rating_score/2)]} ({b.rating_count})', 'center', CellKind.TEXT),
+    Column('판매 지수', lambda b: b.sales_point, 'sales_point', CellKind.NUMBER),
+    Column('카테고리', lambda b: b.category, 'left', CellKind.TEXT),
+    Column('교내 도서관 소장', lambda b: 'O' if b.library_status == LibraryBookStatus.EXISTS else ('X' if b.library_status == LibraryBookStatus.NOT_EXISTS else '?'), 'center', CellKind.LIBRARY),
     Column('메모', lambda b: (
         b.memo
         + ("" if b.best_seller_rank == "" else f"\n\n※ 알라딘 {b.best_seller_rank}")
         + (
             ""
             if not b.publish_date or not b.publish_date[:4].isdigit()
-            or int(b.publish_date[:4]) >= datetime.now().year - 4
+            or int(b.publish_date[:4]) >= CURRENT_YEAR - 4
             else "\n\n※ 발간 날짜 확인 필요"
         )
-    ), 'left'),
+    ), 'left', CellKind.MEMO),
 ]
 
-def update_library_status(book: Book, neis_code: str, prov_code: str, session: requests.Session, timeout: int = 10) -> None:
+class BookCache:
+    def __init__(self, path: Optional[str]):
+        self.lock: threading.Lock = threading.Lock()
+        self.db: Optional[shelve.Shelf] = None
+
+        # 파일 캐시가 없어도 한 번 실행하는 동안은 메모리에 보관해요.
+        self.memory: Dict[str, Tuple[float, Any]] = {}
+
+        if path is None:
+            return
+
+        try:
+            self.db = shelve.open(path)
+        except Exception as e:
+            print(f"@@@@@ 캐시 파일({path})을 열 수 없어 캐시 없이 진행해요: {e}")
+
+    def get(self, key: str, ttl: Optional[int]) -> Any:
+        with self.lock:
+            entry: Optional[Tuple[float, Any]] = self.memory.get(key)
+
+            if entry is None and self.db is not None:
+                entry = self.db.get(key)
+
+                if entry is not None:
+                    self.memory[key] = entry
+
+        if entry is None or (ttl is not None and time.time() - entry[0] > ttl):
+            return None
+
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        entry: Tuple[float, Any] = (time.time(), value)
+
+        with self.lock:
+            self.memory[key] = entry
+
+            if self.db is not None:
+                self.db[key] = entry
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+# 일시적인 서버 오류와 요청 제한(429)은 POST(독서로 검색)까지 다시 시도해요.
+RETRY: Retry = Retry(
+    total=4,
+    read=1,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET", "POST"}),
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+
+def create_session() -> requests.Session:
+    session: requests.Session = requests.Session()
+
+    # 호스트마다 작업 스레드 수만큼 연결을 유지하고, 모자라면 반납될 때까지 기다려요.
+    adapter: HTTPAdapter = HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=MAX_WORKERS,
+        pool_block=True,
+        max_retries=RETRY
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    session.headers.update({
+        "User-Agent": f"BookListBuilder/{VERSION}",
+        "Accept-Encoding": "gzip, deflate"
+    })
+
+    return session
+
+def update_library_status(book: Book, neis_code: str, prov_code: str, session: requests.Session, cache: BookCache, timeout: int = 10) -> None:
     url: str = "https://read365.edunet.net/alpasq/api/search"
+    cache_key: str = f"library:{neis_code}:{book.isbn13}"
+
+    if (cached := cache.get(cache_key, LIBRARY_CACHE_TTL)) is not None:
+        apply_library_entry(book, cached)
+        print(f"> [조회 성공][도서관] ISBN {book.isbn13}: 캐시에 저장된 소장 여부를 사용해요.")
+        return
 
     payload: Dict[str, Any] = {
         "searchKeyword": book.isbn13,
@@ -112,13 +258,11 @@ def update_library_status(book: Book, neis_code: str, prov_code: str, session: r
         "coverYn": "N"
     }
 
-    headers: Dict[str, str] = {"Content-Type": "application/json"}
-
     try:
-        response: requests.Response = session.post(url, json=payload, headers=headers, timeout=timeout)
+        response: requests.Response = session.post(url, json=payload, timeout=timeout)
         response.raise_for_status()
 
-        data: Dict[str, Any] = response.json()
+        data: Dict[str, Any] = orjson.loads(response.content)
 
         results: List[Dict[str, Any]] = data.get("data", {}).get("bookList", [])
 
@@ -127,93 +271,84 @@ def update_library_status(book: Book, neis_code: str, prov_code: str, session: r
                 book.library_status = LibraryBookStatus.EXISTS
                 book.key = item.get('bookKey')
                 book.species_key = item.get('speciesKey')
+                cache.set(cache_key, (True, book.key, book.species_key))
                 print(f"> [조회 성공][도서관] ISBN {book.isbn13}: 소장하고 있는 도서에요 ㅡ bookKey: {book.key}, speciesKey: {book.species_key}")
                 return
             
         book.library_status = LibraryBookStatus.NOT_EXISTS
+        cache.set(cache_key, (False, None, None))
         print(f"> [조회 성공][도서관] ISBN {book.isbn13}: 소장하고 있지 않은 도서에요.")
         return
     
     except requests.exceptions.HTTPError as http_err:
         print(f"> [조회 실패][도서관] ISBN {book.isbn13}: HTTP 오류가 발생했어요 - {http_err.response.status_code} {http_err.response.reason}")
         book.library_status = LibraryBookStatus.UNKNOWN
-        return
     
     except requests.exceptions.RequestException as e:
         print(f"> [조회 실패][도서관] ISBN {book.isbn13}: 네트워크 오류가 발생했어요 - {e}")
         book.library_status = LibraryBookStatus.UNKNOWN
-        return
     
     except Exception as e:
         print(f"> [조회 실패][도서관] ISBN {book.isbn13}: 예상치 못한 오류가 발생했어요 - {e}")
         book.library_status = LibraryBookStatus.UNKNOWN
         return
 
-def update_book_info(book: Book, aladin_api_key: str, session: requests.Session, timeout: int = 5) -> None:
-    if book.item_id:
-        url = (
-            f"http://www.aladin.co.kr/ttb/api/ItemLookUp.aspx"
-            f"?ttbkey={aladin_api_key}&itemIdType=ItemId&ItemId={book.item_id}"
-            "&output=js&Version=20131101&OptResult=Story,categoryIdList,"
-            "bestSellerRank,ratingInfo,reviewList"
-        )
-    else:
-        url = (
-            f"http://www.aladin.co.kr/ttb/api/ItemLookUp.aspx"
-            f"?ttbkey={aladin_api_key}&itemIdType=ISBN&ItemId={book.isbn13}"
-            "&output=js&Version=20131101&OptResult=Story,categoryIdList,"
-            "bestSellerRank,ratingInfo,reviewList"
-        )
+    if (stale := cache.get(cache_key, None)) is not None:
+        apply_library_entry(book, stale)
+        print(f"> [조회 성공][도서관] ISBN {book.isbn13}: 기한이 지난 캐시의 소장 여부를 대신 사용해요.")
+
+def apply_library_entry(book: Book, entry: Tuple[bool, Optional[int], Optional[int]]) -> None:
+    exists, book.key, book.species_key = entry
+    book.library_status = LibraryBookStatus.EXISTS if exists else LibraryBookStatus.NOT_EXISTS
+
+def update_book_info(book: Book, aladin_api_key: str, session: requests.Session, cache: BookCache, timeout: int = 5) -> Optional[str]:
+    params: Dict[str, Any] = {
+        "ttbkey": aladin_api_key,
+        "itemIdType": "ItemId" if book.item_id else "ISBN",
+        "ItemId": book.item_id or book.isbn13,
+        **ALADIN_LOOKUP_PARAMS
+    }
+
+    cache_key: str = f"aladin:item:{book.item_id}" if book.item_id else f"aladin:isbn:{book.isbn13}"
 
     try:
-        resp: requests.Response = session.get(url, timeout=timeout)
-        resp.raise_for_status()
+        item: Optional[Dict[str, Any]] = cache.get(cache_key, ALADIN_CACHE_TTL)
+        from_cache: bool = item is not None
 
-        items: List[Dict[str, Any]] = resp.json().get("item", [])
+        if item is None:
+            resp: requests.Response = session.get(ALADIN_LOOKUP_URL, params=params, timeout=timeout)
+            resp.raise_for_status()
 
-        if not items:
-            print(f"> [조회 실패][알라딘] ISBN {book.isbn13}: 데이터를 찾을 수 없어요.")
-            return
-        
-        item: Dict[str, Any] = items[0]
-
-        desc: str = item.get("description", "").strip()
-        rating_info: Dict[str, Any] = item.get("subInfo", {}).get("ratingInfo", {})
-        score: float = float(rating_info.get("ratingScore", 0))
-        count: int = int(rating_info.get("ratingCount", 0))
-
-        book.title = item.get("title", "")
-        book.item_id = item.get("itemId", "")
-        book.author = item.get("author", "")
-        book.publisher = item.get("publisher", "")
-        book.isbn13 = item.get("isbn13", "")
-        book.standard_price = int(item.get("priceStandard", 0))
-        book.publish_date = item.get("pubDate", "")
-        book.description = desc
-        book.rating_score = score
-        book.rating_count = count
-        book.sales_point = item.get("salesPoint", 0)
-        book.category = item.get("categoryName", "")
-        book.best_seller_rank = item.get("subInfo", {}).get("bestSellerRank", "")
-
-        print(f"> [조회 성공][알라딘] ISBN {book.isbn13}: '{book.title}' 정보를 가져왔어요.")
-
-        if cover_url := item.get("cover"):
-            try:
-                cover_resp: requests.Response = session.get(cover_url, timeout=timeout)
-                cover_resp.raise_for_status()
+            items: List[Dict[str, Any]] = orjson.loads(resp.content).get("item", [])
+
+            if not items:
+                print(f"> [조회 실패][알라딘] ISBN {book.isbn13}: 데이터를 찾을 수 없어요.")
+                return
 
-                book.cover = BytesIO(cover_resp.content)
+            item = items[0]
 
-            except requests.exceptions.RequestException as e:
-                print(f"> [오류][알라딘] ISBN {book.isbn13} 커버 이미지를 가져오는 중 오류가 발생했어요: {e}")
-                book.cover = None
+            # 알라딘 링크와 ISBN 어느 쪽으로도 찾을 수 있도록 두 키에 모두 저장해요.
+            cache_keys: Set[str] = {cache_key}
+
+            if item.get("itemId"):
+                cache_keys.add(f"aladin:item:{item['itemId']}")
+            if item.get("isbn13"):
+                cache_keys.add(f"aladin:isbn:{item['isbn13']}")
+
+            for key in cache_keys:
+                cache.set(key, item)
+
+        apply_aladin_item(book, item)
+
+        print(f"> [조회 성공][알라딘] ISBN {book.isbn13}: '{book.title}' 정보를 {'캐시에서 ' if from_cache else ''}가져왔어요.")
+
+        # 커버 이미지는 도서관 조회와 겹쳐서 받을 수 있도록 주소만 넘겨줘요.
+        return item.get("cover") or None
 
     except requests.exceptions.RequestException as e:
         print(f"> [조회 실패][알라딘] ISBN {book.isbn13}: 정보 가져오는 중 오류가 발생했어요 - {e}")
-        return
     
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         print(f"> [조회 실패][알라딘] ISBN {book.isbn13}: 응답이 유효한 JSON 형식이 아니에요.")
         return
     
@@ -221,23 +356,92 @@ def update_book_info(book: Book, aladin_api_key: str, session: requests.Session,
          print(f"> [조회 실패][알라딘] ISBN {book.isbn13}: 정보 처리 중 예상치 못한 오류가 발생했어요 - {e}")
          return
 
-def get_text_px(text: str, font: ImageFont.FreeTypeFont) -> Tuple[int, int]:
-    char_width_avg: float = font.getlength('A')
-    char_height: int = font.size
+    if (stale := cache.get(cache_key, None)) is None:
+        return
+
+    apply_aladin_item(book, stale)
+    print(f"> [조회 성공][알라딘] ISBN {book.isbn13}: '{book.title}' 정보를 기한이 지난 캐시에서 대신 가져왔어요.")
+
+    return stale.get("cover") or None
+
+def apply_aladin_item(book: Book, item: Dict[str, Any]) -> None:
+    desc: str = item.get("description", "").strip()
+    rating_info: Dict[str, Any] = item.get("subInfo", {}).get("ratingInfo", {})
+    score: float = float(rating_info.get("ratingScore", 0))
+    count: int = int(rating_info.get("ratingCount", 0))
+
+    book.title = item.get("title", "")
+    book.item_id = item.get("itemId", "")
+    book.author = item.get("author", "")
+    book.publisher = item.get("publisher", "")
+    book.isbn13 = item.get("isbn13", "")
+    book.standard_price = int(item.get("priceStandard", 0))
+    book.publish_date = item.get("pubDate", "")
+    book.description = desc
+    book.rating_score = score
+    book.rating_count = count
+    book.sales_point = item.get("salesPoint", 0)
+    book.category = item.get("categoryName", "")
+    book.best_seller_rank = item.get("subInfo", {}).get("bestSellerRank", "")
+
+def update_cover(book: Book, cover_url: str, session: requests.Session, cache: BookCache, timeout: int = 5) -> None:
+    cache_key: str = f"cover:{cover_url}"
+
+    try:
+        content: Optional[bytes] = cache.get(cache_key, COVER_CACHE_TTL)
+        from_cache: bool = content is not None
+
+        if content is None:
+            cover_resp: requests.Response = session.get(cover_url, timeout=timeout)
+            cover_resp.raise_for_status()
+
+            content = cover_resp.content
+
+        book.cover_format, book.cover_size, book.cover_dpi = read_cover_header(content)
+        book.cover = content
+
+        # 새로 받은 이미지 중 읽을 수 있는 것만 저장해요.
+        if not from_cache:
+            cache.set(cache_key, content)
+
+    except requests.exceptions.RequestException as e:
+        print(f"> [오류][알라딘] ISBN {book.isbn13} 커버 이미지를 가져오는 중 오류가 발생했어요: {e}")
+        book.cover = None
 
+    except Exception as e:
+        print(f"> [오류][알라딘] ISBN {book.isbn13} 커버 이미지를 읽을 수 없어요: {e}")
+        book.cover = None
+
+def read_cover_header(raw: bytes) -> Tuple[str, Tuple[int, int], Tuple[float, float]]:
+    # Image.open은 헤더만 읽고 픽셀은 디코딩하지 않아요.
+    im: Image.Image = Image.open(BytesIO(raw))
+
+    # xlsxwriter와 같은 방식으로 JFIF DPI 계산 (단위가 없거나 0, 1이면 96)
+    factor: Optional[float] = {1: 1.0, 2: 2.54}.get(im.info.get('jfif_unit', 0))
+    density: Tuple[int, int] = im.info.get('jfif_density', (0, 0))
+    dpi: Tuple[float, float] = tuple(
+        d * factor if factor and d * factor not in (0, 1) else 96.0
+        for d in density
+    )
+
+    return im.format or '', im.size, dpi
+
+# 같은 문자열이 자주 반복되니 결과를 기억해둬요.
+@functools.lru_cache(maxsize=4096)
+def get_text_px(text: str, char_width_avg: float) -> Tuple[int, int]:
     max_width: int = 0
 
     lines: List[str] = text.split('\n')
 
     for line in lines:
-        line_width: float = 0
-
-        for char in line:
-            line_width += char_width_avg * 2 if ord(char) > 127 else char_width_avg
+        # ASCII가 아닌 문자는 두 칸으로 계산해요.
+        wide_chars: int = len(line) - len(line.encode('ascii', 'ignore'))
+        line_width: float = (len(line) + wide_chars) * char_width_avg
 
         max_width = max(max_width, line_width)
 
-    return int(max_width), int(len(lines) * char_height * 1.2)
+    # 너비와 줄 수를 함께 돌려줘요.
+    return int(max_width), len(lines)
 
 def col_to_px(width: float) -> int:
     return int(width * 7 + 5)
@@ -245,167 +449,322 @@ def col_to_px(width: float) -> int:
 def row_to_px(height: float) -> int:
     return int(height * 96 / 72)
 
-def create(
-        books: List[Book],
-        output: str,
+def cover_fits_cell(book: Book, size: Tuple[int, int]) -> bool:
+    if book.cover_format != 'JPEG':
+        return False
+
+    return all(
+        src <= dst * COVER_REENCODE_MAX_RATIO
+        for src, dst in zip(book.cover_size, size)
+    )
+
+def resize_cover(raw: bytes, size: Tuple[int, int]) -> bytes:
+    im: Image.Image = Image.open(BytesIO(raw))
+    buf: BytesIO = BytesIO()
+
+    # JPEG은 디코딩 단계에서 셀 크기에 가깝게 줄여서 읽어요.
+    im.draft('RGB', size)
+
+    # JPEG은 투명도를 지원하지 않으니 투명한 이미지는 흰 배경 위에 합성해요.
+    if im.mode in ('RGBA', 'LA') or 'transparency' in im.info:
+        im = im.convert('RGBA')
+        background: Image.Image = Image.new('RGB', im.size, 'white')
+        background.paste(im, mask=im.getchannel('A'))
+        im = background
+    else:
+        im = im.convert('RGB')
+
+    # 셀 크기의 썸네일이라 BILINEAR와 JPEG으로 충분해요.
+    # 큰 원본은 reducing_gap으로 정수배 축소를 먼저 해요.
+    im_resized: Image.Image = im.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+    im_resized.save(buf, format='JPEG', quality=82, optimize=False)
+
+    return buf.getvalue()
+
+@dataclass
+class SheetLayout:
+    name: str
+    books: List[Book]
+    rendered: List[List[Any]] # 도서별 셀 값 (COLUMNS 순서)
+    col_widths: List[float]
+    row_heights: List[float]
+    cover_futures: Dict[int, concurrent.futures.Future] # 행 번호별 커버 이미지 변환 작업
+
+def layout_sheet(
+        sheet_name: str,
+        group_books: List[Book],
+        avg_char_w: float,
         font_size_pt: int,
-        aladin_api_key: Optional[str] = None,
-        neis_code: Optional[str] = None,
-        prov_code: Optional[str] = None,
-        school_name: Optional[str] = None
-    ) -> None:
-    font: ImageFont.ImageFont = ImageFont.load_default()
-    workbook: xlsxwriter.Workbook = xlsxwriter.Workbook(output, {'default_date_format': 'yyyy-mm-dd'})
-    fm: FormatManager = FormatManager(workbook, font_size_pt)
-    session: requests.Session = requests.Session()
+        image_executor: concurrent.futures.Executor,
+        resized_covers: Dict[Tuple[bytes, Tuple[int, int]], concurrent.futures.Future]
+    ) -> SheetLayout:
+    group_books.sort(key=lambda x: x.order)
+
+    # 셀 값과 너비 계산용 문자열은 도서마다 한 번만 만들어요.
+    rendered: List[List[Any]] = [[col.getter(book) for col in COLUMNS] for book in group_books]
+    rendered_texts: List[List[str]] = [
+        [
+            '' if idx == IMG_IDX else (f'{int(val):,}원' if col.fmt_key == 'price' else str(val or ''))
+            for idx, (col, val) in enumerate(zip(COLUMNS, values))
+        ]
+        for values in rendered
+    ]
+
+    col_widths: List[float] = [IMG_COL_WIDTH_CHAR] + [0] * (len(COLUMNS) - 1)
+
+    row_lines: List[int] = []
+
+    # 헤더와 도서별 문자열을 한 번씩 훑으며 열 너비와 행의 줄 수를 모아요.
+    for texts in [[col.header for col in COLUMNS]] + rendered_texts:
+        lines: int = 1
+
+        for idx, text in enumerate(texts):
+            if idx == IMG_IDX:
+                continue
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        futures: List[concurrent.futures.Future] = []
+            w_px, text_lines = get_text_px(text, avg_char_w)
+            col_widths[idx] = max(col_widths[idx], w_px / avg_char_w + 0.1)
+            lines = max(lines, text_lines)
 
-        for book in books:
-            if book.item_id is not None and book.isbn13 == "":
-                # 알라딘 정보 조회 후 도서관 상태 조회
-                info_future = executor.submit(update_book_info, book, aladin_api_key, session)
-                concurrent.futures.wait([info_future])
-                futures.append(executor.submit(update_library_status, book, neis_code, prov_code, session))
-            else:
-                # 알라딘과 도서관 동시에 조회
-                futures.append(executor.submit(update_book_info, book, aladin_api_key, session))
-                futures.append(executor.submit(update_library_status, book, neis_code, prov_code, session))
+        row_lines.append(lines)
 
-        concurrent.futures.wait(futures)
+    col_widths = [min(width, 60) for width in col_widths]
 
-    print(f"@@@@@ 총 {len(books)}권의 책 정보를 성공적으로 가져왔어요.")
+    line_height_pt: float = font_size_pt * 1.7
+    row_heights: List[float] = [line_height_pt] + [max(IMG_ROW_HEIGHT, lines * line_height_pt) for lines in row_lines[1:]]
 
-    sheet_sequence: List[str] = []
-    for book in books:
-        if book.sheet_name not in sheet_sequence:
-            sheet_sequence.append(book.sheet_name)
+    cell_w_px: int = col_to_px(col_widths[IMG_IDX])
+    cover_futures: Dict[int, concurrent.futures.Future] = {}
 
-    for sheet_name in sheet_sequence:
-        group_books: List[Book] = [book for book in books if book.sheet_name == sheet_name]
-        group_books.sort(key=lambda x: x.order)
+    # 커버 이미지 변환은 레이아웃을 계산하는 즉시 시작해요.
+    for r, book in enumerate(group_books, start=1):
+        cell_size: Tuple[int, int] = (cell_w_px, row_to_px(row_heights[r]))
 
-        worksheet: xlsxwriter.Worksheet = workbook.add_worksheet(sheet_name)
+        if book.cover and not cover_fits_cell(book, cell_size):
+            cover_key: Tuple[bytes, Tuple[int, int]] = (book.cover, cell_size)
 
-        img_idx: int = 0
-        img_col_width_char: int = 16
+            if cover_key not in resized_covers:
+                resized_covers[cover_key] = image_executor.submit(resize_cover, *cover_key)
 
-        col_widths: List[float] = [img_col_width_char] + [0] * (len(COLUMNS) - 1)
-        avg_char_w: float = font.getlength('A')
+            cover_futures[r] = resized_covers[cover_key]
 
-        for idx, col in enumerate(COLUMNS):
-            if idx == img_idx:
-                continue
+    return SheetLayout(sheet_name, group_books, rendered, col_widths, row_heights, cover_futures)
+
+def write_text(worksheet: Worksheet, row: int, col: int, text: str, cell_format: Format) -> None:
+    # write()의 형식 검사 없이 쓰되 빈 문자열은 서식만 있는 빈 셀로 남겨요.
+    if text:
+        worksheet.write_string(row, col, text, cell_format)
+    else:
+        worksheet.write_blank(row, col, None, cell_format)
+
+def write_sheet(
+        workbook: xlsxwriter.Workbook,
+        fm: FormatManager,
+        layout: SheetLayout,
+        neis_code: Optional[str],
+        prov_code: Optional[str],
+        school_name: Optional[str]
+    ) -> None:
+    worksheet: Worksheet = workbook.add_worksheet(layout.name)
+    row_heights: List[float] = layout.row_heights
+    cell_w_px: int = col_to_px(layout.col_widths[IMG_IDX])
+
+    worksheet.set_row(0, row_heights[0])
+
+    for idx, width in enumerate(layout.col_widths):
+        worksheet.set_column(idx, idx, width)
+        worksheet.write(0, idx, COLUMNS[idx].header, fm.get('header'))
+
+    # 조건부 서식은 데이터 행보다 먼저 지정해요.
+    last_row: int = len(layout.books)
+    last_col: int = len(COLUMNS) - 1
+
+    # 도서관 소장 도서는 노란색으로 행 강조
+    worksheet.conditional_format(1, 0, last_row, last_col, {
+        'type': 'formula',
+        'criteria': '=$L2="링크"',
+        'format': fm.get('highlight')
+    })
+
+    # 5년 이전 출판 도서는 연두색으로 행 강조
+    worksheet.conditional_format(1, 0, last_row, last_col, {
+        'type': 'formula',
+        'criteria': OLD_BOOK_CRITERIA,
+        'format': fm.get('oldbook')
+    })
+
+    # 서식은 열마다 미리 꺼내둬요.
+    col_formats: List[Format] = [fm.get(col.fmt_key or 'center') for col in COLUMNS]
+    link_fmt: Format = fm.get('hyperlink')
+    redbold_fmt: Format = fm.get('redbold')
+
+    # 같은 방법으로 쓰는 열끼리 묶어서 셀마다 분기하지 않아요.
+    cols_by_kind: Dict[CellKind, List[int]] = {kind: [] for kind in CellKind}
+
+    for idx, col in enumerate(COLUMNS):
+        cols_by_kind[col.kind].append(idx)
+
+    # 한 행의 높이, 셀, 커버 이미지를 모두 쓴 뒤에 다음 행으로 넘어가요.
+    for r, (book, values) in enumerate(zip(layout.books, layout.rendered), start=1):
+        worksheet.set_row(r, row_heights[r])
+
+        for idx in cols_by_kind[CellKind.TEXT]:
+            write_text(worksheet, r, idx, values[idx], col_formats[idx])
+
+        for idx in cols_by_kind[CellKind.NUMBER]:
+            worksheet.write_number(r, idx, values[idx], col_formats[idx])
+
+        for idx in cols_by_kind[CellKind.TITLE]:
+            if book.item_id:
+                url = f"https://www.aladin.co.kr/shop/wproduct.aspx?ItemId={book.item_id}"
+                worksheet.write_url(r, idx, url, link_fmt, string=values[idx])
+            else:
+                write_text(worksheet, r, idx, values[idx], col_formats[idx])
 
-            header_w_px, _ = get_text_px(col.header, font)
-            char_w: float = header_w_px / avg_char_w + 0.1
-            col_widths[idx] = max(col_widths[idx], char_w)
+        for idx in cols_by_kind[CellKind.LIBRARY]:
+            if book.library_status == LibraryBookStatus.EXISTS and book.key and book.species_key:
+                url = f"https://read365.edunet.net/PureScreen/SearchDetail?bookKey={book.key}&speciesKey={book.species_key}&provCode={prov_code}&neisCode={neis_code}&schoolName={school_name}&fromSchool=true"
+                worksheet.write_url(r, idx, url, link_fmt, string='링크')
+            else:
+                write_text(worksheet, r, idx, values[idx], col_formats[idx])
+
+        for idx in cols_by_kind[CellKind.MEMO]:
+            best_seller_text = f"\n\n※ 알라딘 {book.best_seller_rank}" if book.best_seller_rank else ""
+            oldbook_text = "\n\n※ 발간 날짜 확인 필요" if (book.publish_date and book.publish_date[:4].isdigit() and int(book.publish_date[:4]) < CURRENT_YEAR - 4) else ""
+            if best_seller_text or oldbook_text:
+                rich_args = [book.memo]
+                if best_seller_text:
+                    rich_args += [redbold_fmt, best_seller_text]
+                if oldbook_text:
+                    rich_args += [redbold_fmt, oldbook_text]
+                rich_args += [col_formats[idx]]
+                worksheet.write_rich_string(r, idx, *rich_args)
+            elif book.memo.startswith(MEMO_URL_PREFIXES):
+                worksheet.write_url(r, idx, book.memo, col_formats[idx])
+            else:
+                write_text(worksheet, r, idx, book.memo, col_formats[idx])
 
-            for book in group_books:
-                val: Any = col.getter(book)
-                text: str = f'{int(val):,}원' if col.fmt_key == 'price' else str(val or '')
+        if r in layout.cover_futures:
+            try:
+                buf: BytesIO = BytesIO(layout.cover_futures[r].result())
+            except Exception as e:
+                print(f"> [오류][알라딘] ISBN {book.isbn13} 커버 이미지를 읽을 수 없어요: {e}")
+            else:
+                worksheet.insert_image(r, IMG_IDX, f"{book.isbn13}.jpg", {'image_data': buf, 'x_offset': 0, 'y_offset': 0, 'positioning': 1})
+        elif book.cover:
+            # 셀 크기에 가까운 원본 JPEG은 그대로 셀 크기에 맞춰 넣어요.
+            (w, h), (x_dpi, y_dpi) = book.cover_size, book.cover_dpi
+            worksheet.insert_image(r, IMG_IDX, f"{book.isbn13}.jpg", {
+                'image_data': BytesIO(book.cover),
+                'x_scale': cell_w_px / w * x_dpi / 96,
+                'y_scale': row_to_px(row_heights[r]) / h * y_dpi / 96,
+                'x_offset': 0,
+                'y_offset': 0,
+                'positioning': 1
+            })
 
-                w_px, _ = get_text_px(text, font)
-                char_w = w_px / avg_char_w + 0.1
+def create(
+        books: List[Book],
+        output: str,
+        font_size_pt: int,
+        aladin_api_key: Optional[str] = None,
+        neis_code: Optional[str] = None,
+        prov_code: Optional[str] = None,
+        school_name: Optional[str] = None,
+        cache: Optional[BookCache] = None
+    ) -> None:
+    # 실패한 실행이 반쯤 쓴 파일을 남기지 않도록 임시 파일에 쓴 뒤 이름을 바꿔요.
+    tmp_output: str = f"{output}.tmp"
+    font: ImageFont.ImageFont = ImageFont.load_default()
+    # 글자 너비는 한 번만 재서 넘겨줘요.
+    avg_char_w: float = font.getlength('A')
+    # constant_memory 모드라 행은 위에서부터 순서대로 써야 해요.
+    # 수식/URL 자동 변환 검사는 끄고 링크는 write_url로 직접 써요.
+    workbook: xlsxwriter.Workbook = xlsxwriter.Workbook(tmp_output, {
+        'default_date_format': 'yyyy-mm-dd',
+        'constant_memory': True,
+        'strings_to_formulas': False,
+        'strings_to_urls': False
+    })
+    fm: FormatManager = FormatManager(workbook, font_size_pt)
+    session: requests.Session = create_session()
 
-                col_widths[idx] = max(col_widths[idx], char_w)
+    if cache is None:
+        cache = BookCache(None)
 
-            col_widths[idx] = min(col_widths[idx], 60)
+    # 같은 도서가 여러 행에 있으면 한 번만 조회하고 결과를 각 행에 복사해요.
+    lookup_keys: List[Tuple[str, Any]] = [
+        ('item', book.item_id) if book.item_id is not None and book.isbn13 == "" else ('isbn', book.isbn13)
+        for book in books
+    ]
+    unique_books: Dict[Tuple[str, Any], Book] = {}
+    for lookup_key, book in zip(lookup_keys, books):
+        unique_books.setdefault(lookup_key, book)
 
-        for idx, width in enumerate(col_widths):
-            worksheet.set_column(idx, idx, width)
-            worksheet.write(0, idx, COLUMNS[idx].header, fm.get('header'))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures: List[concurrent.futures.Future] = []
+        info_futures: Dict[concurrent.futures.Future, Tuple[Book, bool]] = {}
 
-        row_heights: List[float] = [font_size_pt * 1.7]
+        for book in unique_books.values():
+            # ISBN을 모르는 도서(알라딘 링크)는 알라딘 조회가 끝난 뒤에 도서관 상태를 조회해요.
+            library_pending: bool = book.item_id is not None and book.isbn13 == ""
 
-        for book in group_books:
-            max_h: float = font_size_pt * 1.7
+            info_futures[executor.submit(update_book_info, book, aladin_api_key, session, cache)] = (book, library_pending)
 
-            for idx, col in enumerate(COLUMNS):
-                if idx == img_idx:
-                    cell_h: float = 112
-                else:
-                    lines: int = (str(col.getter(book)) or '').count('\n') + 1
-                    cell_h = lines * font_size_pt * 1.7
-
-                max_h = max(max_h, cell_h)
-
-            row_heights.append(max_h)
-
-        for r, h in enumerate(row_heights):
-            worksheet.set_row(r, h)
-
-        for r, book in enumerate(group_books, start=1):
-            for idx, col in enumerate(COLUMNS):
-                if idx == img_idx:
-                    continue
-
-                val: Any = col.getter(book)
-
-                if idx == 11:
-                    if book.library_status == LibraryBookStatus.EXISTS and book.key and book.species_key:
-                        url = f"https://read365.edunet.net/PureScreen/SearchDetail?bookKey={book.key}&speciesKey={book.species_key}&provCode={prov_code}&neisCode={neis_code}&schoolName={school_name}&fromSchool=true"
-                        worksheet.write_url(r, idx, url, fm.get('hyperlink'), string='링크')
-                    else:
-                        worksheet.write(r, idx, val, fm.get(col.fmt_key or 'center'))
-                elif idx == 1:
-                    if book.item_id:
-                        url = f"https://www.aladin.co.kr/shop/wproduct.aspx?ItemId={book.item_id}"
-                        worksheet.write_url(r, idx, url, fm.get('hyperlink'), string=val)
-                    else:
-                        worksheet.write(r, idx, val, fm.get(col.fmt_key or 'center'))
-                elif col.fmt_key == 'price':
-                    worksheet.write_number(r, idx, val, fm.get('price'))
-                elif col.fmt_key == 'sales_point':
-                    worksheet.write_number(r, idx, val, fm.get('sales_point'))
-                elif idx == 12:
-                    best_seller_text = f"\n\n※ 알라딘 {book.best_seller_rank}" if book.best_seller_rank else ""
-                    oldbook_text = "\n\n※ 발간 날짜 확인 필요" if (book.publish_date and book.publish_date[:4].isdigit() and int(book.publish_date[:4]) < datetime.now().year - 4) else ""
-                    if best_seller_text or oldbook_text:
-                        rich_args = [book.memo]
-                        if best_seller_text:
-                            rich_args += [fm.get('redbold'), best_seller_text]
-                        if oldbook_text:
-                            rich_args += [fm.get('redbold'), oldbook_text]
-                        rich_args += [fm.get('left')]
-                        worksheet.write_rich_string(r, idx, *rich_args)
-                    else:
-                        worksheet.write(r, idx, book.memo, fm.get('left'))
-                else:
-                    worksheet.write(r, idx, val, fm.get(col.fmt_key or 'center'))
+            if not library_pending:
+                futures.append(executor.submit(update_library_status, book, neis_code, prov_code, session, cache))
+
+        # 알라딘 조회가 끝나는 순서대로 커버 이미지와 도서관 상태를 동시에 조회
+        for info_future in concurrent.futures.as_completed(info_futures):
+            book, library_pending = info_futures[info_future]
 
-        for r, book in enumerate(group_books, start=1):
-            if book.cover:
-                cell_w_px: int = col_to_px(col_widths[img_idx])
-                cell_h_px: int = row_to_px(row_heights[r])
+            if cover_url := info_future.result():
+                futures.append(executor.submit(update_cover, book, cover_url, session, cache))
 
-                im: Image.Image = Image.open(book.cover)
-                buf: BytesIO = BytesIO()
+            if library_pending and book.isbn13:
+                futures.append(executor.submit(update_library_status, book, neis_code, prov_code, session, cache))
 
-                im_resized: Image.Image = im.resize((cell_w_px, cell_h_px), Image.Resampling.LANCZOS)
-                im_resized.save(buf, format='PNG')
+        concurrent.futures.wait(futures)
 
-                buf.seek(0)
+    books = [
+        book if unique_books[lookup_key] is book
+        else replace(unique_books[lookup_key], sheet_name=book.sheet_name, memo=book.memo, order=book.order)
+        for lookup_key, book in zip(lookup_keys, books)
+    ]
+
+    print(f"@@@@@ 총 {len(books)}권의 책 정보를 성공적으로 가져왔어요.")
+
+    # 시트가 처음 등장한 순서를 유지하면서 한 번에 도서를 시트별로 묶어요.
+    groups: Dict[str, List[Book]] = {}
+    for book in books:
+        groups.setdefault(book.sheet_name, []).append(book)
+
+    try:
+        # Pillow는 변환 중에 GIL을 놓으니 커버 이미지 변환은 스레드로 병렬 처리해요.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as image_executor:
+            # 같은 커버를 같은 크기로 변환하는 작업은 시트와 관계없이 한 번만 해요.
+            resized_covers: Dict[Tuple[bytes, Tuple[int, int]], concurrent.futures.Future] = {}
+
+            # 모든 시트의 레이아웃을 먼저 계산해서 커버 변환을 한꺼번에 맡겨둬요.
+            layouts: List[SheetLayout] = [
+                layout_sheet(sheet_name, group_books, avg_char_w, font_size_pt, image_executor, resized_covers)
+                for sheet_name, group_books in groups.items()
+            ]
+
+            for layout in layouts:
+                write_sheet(workbook, fm, layout, neis_code, prov_code, school_name)
+
+        workbook.close()
+        os.replace(tmp_output, output)
+    except BaseException:
+        # 원래 오류를 그대로 알리도록 정리 중에 난 오류는 무시해요.
+        if not workbook.fileclosed:
+            with contextlib.suppress(Exception):
+                workbook.close()
+        with contextlib.suppress(OSError):
+            os.remove(tmp_output)
+        raise
 
-                worksheet.insert_image(r, img_idx, f"{book.isbn13}.png", {'image_data': buf, 'x_offset': 0, 'y_offset': 0, 'positioning': 1})
-        
-        # 도서관 소장 도서는 노란색으로 행 강조
-        worksheet.conditional_format(1, 0, len(group_books), len(COLUMNS)-1, {
-            'type': 'formula',
-            'criteria': '=$L2="링크"',
-            'format': fm.get('highlight')
-        })
-
-        # 5년 이전 출판 도서는 연두색으로 행 강조
-        current_year = datetime.now().year
-        worksheet.conditional_format(1, 0, len(group_books), len(COLUMNS)-1, {
-            'type': 'formula',
-            'criteria': f'=AND(ISNUMBER(VALUE(LEFT($G2,4))), VALUE(LEFT($G2,4))<>{current_year}, VALUE(LEFT($G2,4))<{current_year - 4})',
-            'format': fm.get('oldbook')
-        })
-
-    workbook.close()
     print(f"@@@@@ 엑셀 파일({output})을 저장했어요.")
 
 def get_unique_filename(base_path: str) -> str:
@@ -430,14 +789,14 @@ if __name__ == "__main__":
                 "aladinKey": "write here",
                 "libraryLink": "write here",
                 "outputFileName": "output.xlsx"
-            }, f, allow_unicode=True)
+            }, f, Dumper=YamlDumper, allow_unicode=True)
 
         print(f"config.yml 파일이 존재하지 않아 기본 템플릿을 생성했어요. 값을 채워넣고 다시 실행해주세요.")
         input("( ･∀･)ﾉｼ 엔터키를 눌러 프로그램을 종료하세요.")
         sys.exit(1)
 
     with open("config.yml", encoding="utf-8") as f:
-        config: Dict[str, Any] = yaml.safe_load(f)
+        config: Dict[str, Any] = yaml.load(f, Loader=YamlLoader)
         required_keys: List[str] = ["aladinKey", "libraryLink", "outputFileName"]
         for k in required_keys:
             if k not in config or not config[k]:
@@ -482,18 +841,21 @@ if __name__ == "__main__":
         sys.exit(1)
 
     try:
-        workbook: openpyxl.Workbook = openpyxl.load_workbook(INPUT_XLSX_FILE, data_only=True)
-        sheet: openpyxl.worksheet.worksheet.Worksheet = workbook.active
+        # 서식 정보 없이 값만 읽도록 읽기 전용 모드로 열어요.
+        workbook: openpyxl.Workbook = openpyxl.load_workbook(INPUT_XLSX_FILE, data_only=True, read_only=True)
+        sheet: openpyxl.worksheet._read_only.ReadOnlyWorksheet = workbook.active
+
+        # 읽기 전용 모드는 파일에 적힌 시트 크기를 믿으니 초기화해서 끝까지 읽어요.
+        sheet.reset_dimensions()
 
-        for row_idx, row in enumerate(sheet.iter_rows(min_row=2, max_col=3), start=1):
-            isbn_cell: openpyxl.cell.cell.Cell = row[0]
-            sheet_cell: Optional[openpyxl.cell.cell.Cell] = row[1] if len(row) > 1 else None
-            memo_cell: Optional[openpyxl.cell.cell.Cell] = row[2] if len(row) > 2 else None
+        # 값만 튜플로 받고, 짧은 행은 None으로 채워 세 칸을 맞춰요.
+        for row_idx, row in enumerate(sheet.iter_rows(min_row=2, max_col=3, values_only=True), start=1):
+            isbn_val, sheet_val, memo_val = (row + (None, None, None))[:3]
 
-            if isbn_cell.value:
-                raw = str(isbn_cell.value).strip()
-                sheet_name = str(sheet_cell.value).strip() if sheet_cell and sheet_cell.value else ''
-                memo = str(memo_cell.value).strip() if memo_cell and memo_cell.value else ''
+            if isbn_val:
+                raw = str(isbn_val).strip()
+                sheet_name = str(sheet_val).strip() if sheet_val else ''
+                memo = str(memo_val).strip() if memo_val else ''
 
                 if not sheet_name:
                     print(f"'{raw}' 책이 시트가 지정되지 않았어요.")
@@ -518,6 +880,8 @@ if __name__ == "__main__":
                     Book(item_id=item_id, isbn13=book_isbn, sheet_name=sheet_name, memo=memo, order=row_idx)
                 )
 
+        workbook.close()
+
     except Exception as e:
         print(f"@@@@@ '{INPUT_XLSX_FILE}' 파일을 읽는 중 오류가 발생했어요: {e}")
         input("( ･∀･)ﾉｼ 엔터키를 눌러 프로그램을 종료하세요.")
@@ -528,5 +892,12 @@ if __name__ == "__main__":
         input("( ･∀･)ﾉｼ 엔터키를 눌러 프로그램을 종료하세요.")
         sys.exit(1)
 
-    create(books_to_check, OUTPUT_XLSX_FILE, DEFAULT_FONT_SIZE_PT, ALADIN_API_KEY, NEIS_CODE, PROV_CODE, SCHOOL_NAME)
+    # --no-cache를 주면 캐시 없이 모두 새로 조회해요.
+    cache: BookCache = BookCache(None if "--no-cache" in sys.argv[1:] else CACHE_FILE)
+
+    try:
+        create(books_to_check, OUTPUT_XLSX_FILE, DEFAULT_FONT_SIZE_PT, ALADIN_API_KEY, NEIS_CODE, PROV_CODE, SCHOOL_NAME, cache)
+    finally:
+        cache.close()
+
     input("( ･∀･)ﾉｼ 엔터키를 눌러 프로그램을 종료하세요.")
\ No newline at end of file